@@ -1,11 +1,28 @@
 import sqlite3
 import pandas as pd
 import os
+import atexit
+from functools import lru_cache
 
 # 1. Path Management (Ensures the script finds the DB on your Mac)
 base_path = os.path.dirname(os.path.abspath(__file__))
 db_path = os.path.join(base_path, 'revenue_intelligence.db')
 
+@lru_cache(maxsize=1)
+def get_conn():
+    # One connection per process: reused across analysis runs, closed at exit
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.execute("PRAGMA cache_size=-20000")
+    # Memory-map the DB file so reads skip the userspace page copy
+    conn.execute("PRAGMA mmap_size=268435456")
+    atexit.register(close_conn, conn)
+    return conn
+
+def close_conn(conn):
+    # Let SQLite refresh planner stats for the tables this process queried
+    conn.execute("PRAGMA optimize")
+    conn.close()
+
 def run_analysis():
     print("--- 🔍 STARTING REVENUE ANALYSIS ---")
     
@@ -16,10 +33,11 @@ def run_analysis():
         return
 
     # 3. Connect to the database
-    conn = sqlite3.connect(db_path)
+    conn = get_conn()
 
     # 4. The "Revenue Intelligence" SQL Query
     # This query identifies high-value customers and their most recent activity
+    # GROUP BY streams off idx_customer (created by setup_db.py) instead of a temp grouping b-tree
     query = """
     SELECT 
         CUSTOMERNAME,
@@ -37,8 +55,9 @@ def run_analysis():
     try:
         print("📊 Querying database for Top 10 High-Value Accounts...")
         
-        # 5. Execute and load into Pandas
-        df = pd.read_sql_query(query, conn)
+        # 5. Execute and load into Pandas (10 rows: skip pandas' SQL layer)
+        cursor = conn.execute(query)
+        df = pd.DataFrame(cursor.fetchall(), columns=[col[0] for col in cursor.description])
 
         # 6. Display the Results
         print("\n--- 🏆 TOP 10 ACCOUNTS BY REVENUE ---")
@@ -49,8 +68,6 @@ def run_analysis():
         
     except Exception as e:
         print(f"❌ An error occurred during analysis: {e}")
-    finally:
-        conn.close()
 
     print("--- 🏁 SCRIPT FINISHED ---")
 
@@ -2,8 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import numpy as np
-import sqlite3
-from datetime import datetime, timedelta
+import numba
+import polars as pl
+from datetime import datetime
 from faker import Faker
 
 # --- 1. CONFIGURATION & SETUP ---
@@ -38,135 +39,322 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # --- 2. DATA GENERATOR ---
+@st.cache_resource
+def get_company_pool(size=512):
+    # Faker is slow per call, so build the name pool once per process and sample from it.
+    # Faker repeats itself, so keep drawing until the pool holds `size` distinct names
+    names = set()
+    while len(names) < size:
+        names.update(fake.company() for _ in range(size - len(names)))
+    return np.array(sorted(names))
+
+# Tier and risk are stored as int8 codes; these lookups are only used for display
+TIER_LABELS = np.array(['Tier 1: Strategic', 'Tier 2: Growth', 'Tier 3: SMB'])
+RISK_LABELS = np.array(['Healthy', 'At Risk', 'Critical'])
+HEALTHY, AT_RISK, CRITICAL = 0, 1, 2
+
+def with_labels(df):
+    # Attach display strings for the Tier/Risk codes right before charting
+    return df.assign(Tier=np.take(TIER_LABELS, df['Tier_Code']), Risk_Status=np.take(RISK_LABELS, df['Risk_Code']))
+
+@numba.njit(cache=True)
+def compute_health_and_risk(last_login, nps, tickets, days_to_renewal, out_health, out_risk):
+    # Weighted health score (Engagement 40%, NPS 30%, Support 30%) and risk code
+    # fused into a single pass over the rows
+    for i in range(len(last_login)):
+        score_engagement = max(100 - (last_login[i] * 0.5), 0)
+        score_nps = nps[i] * 10
+        score_support = max(100 - (tickets[i] * 5), 0)
+        health = int((score_engagement * 0.4) + (score_nps * 0.3) + (score_support * 0.3))
+        out_health[i] = health
+        if days_to_renewal[i] < 90 and health < 50:
+            out_risk[i] = CRITICAL
+        elif health < 70:
+            out_risk[i] = AT_RISK
+        else:
+            out_risk[i] = HEALTHY
+
 @st.cache_data
 def generate_enterprise_data(rows=200):
-    data = []
     industries = ['FinTech', 'Healthcare', 'E-commerce', 'Manufacturing', 'SaaS', 'Logistics']
-    tiers = ['Tier 1: Strategic', 'Tier 2: Growth', 'Tier 3: SMB']
     
     current_date = datetime.now()
+    # Unseeded, so each "Sync Warehouse" (cache clear) produces a fresh portfolio
+    rng = np.random.default_rng()
     
-    for _ in range(rows):
-        tier = np.random.choice(tiers, p=[0.15, 0.35, 0.50])
-        
-        if "Tier 1" in tier:
-            arr = np.random.uniform(200000, 1500000)
-            employees = np.random.randint(1000, 50000)
-        elif "Tier 2" in tier:
-            arr = np.random.uniform(50000, 199000)
-            employees = np.random.randint(200, 1000)
-        else:
-            arr = np.random.uniform(10000, 49000)
-            employees = np.random.randint(10, 200)
+    # Columnar generation: draw every attribute as a whole array in one call
+    tier_idx = rng.choice(3, size=rows, p=[0.15, 0.35, 0.50])
+    
+    # Per-tier ARR bounds (Tier 1, Tier 2, Tier 3), broadcast onto each row
+    arr_low = np.array([200000, 50000, 10000])[tier_idx]
+    arr_high = np.array([1500000, 199000, 49000])[tier_idx]
+    
+    arr = rng.uniform(arr_low, arr_high)
+    
+    growth_rate = rng.uniform(-0.10, 0.30, size=rows)
+    previous_arr = arr / (1 + growth_rate)
+    
+    # Narrowest integer types that hold each metric's range
+    last_login_days = rng.integers(0, 150, size=rows, dtype=np.int16)
+    nps_score = rng.integers(0, 11, size=rows, dtype=np.int8)
+    open_tickets = rng.integers(0, 15, size=rows, dtype=np.int8)
+    
+    days_to_renewal = rng.integers(-15, 365, size=rows, dtype=np.int16)
+    renewal_date = current_date + pd.to_timedelta(days_to_renewal, unit='D')
+    
+    health_score = np.empty(rows, dtype=np.int8)
+    risk_code = np.empty(rows, dtype=np.int8)
+    compute_health_and_risk(last_login_days, nps_score, open_tickets, days_to_renewal, health_score, risk_code)
+    
+    company_pool = get_company_pool()
+    account_names = rng.choice(company_pool, size=rows, replace=rows > len(company_pool))
+    
+    return pd.DataFrame({
+        "Account_Name": account_names,
+        # Lowercased once here so the account search is a plain substring scan
+        "Account_Name_Lower": np.char.lower(account_names),
+        # Low-cardinality label: int8 codes + a 6-entry dictionary instead of one str per row
+        "Industry": pd.Categorical.from_codes(rng.integers(0, len(industries), size=rows), categories=industries),
+        # float32 halves the bytes scanned by the ARR reductions; totals accumulate in float64
+        "ARR": np.round(arr, 2).astype(np.float32),
+        "Previous_ARR": np.round(previous_arr, 2).astype(np.float32),
+        "Tier_Code": tier_idx.astype(np.int8),
+        "Renewal_Date": renewal_date,
+        # Kept alongside the date so renewal windows are plain integer compares
+        "Days_To_Renewal": days_to_renewal,
+        "Days_Since_Last_Touch": last_login_days,
+        "Health_Score": health_score,
+        "NPS": nps_score,
+        "Open_Tickets": open_tickets,
+        "Risk_Code": risk_code
+    })
 
-        growth_rate = np.random.uniform(-0.10, 0.30)
-        previous_arr = arr / (1 + growth_rate)
+# --- 3. KPI ENGINE ---
+# Cheap cache key for DataFrame arguments: hash the rows once, reduce to a scalar
+FRAME_HASH_FUNCS = {pd.DataFrame: lambda d: pd.util.hash_pandas_object(d, index=False).sum()}
 
-        last_login_days = np.random.randint(0, 150)
-        nps_score = np.random.randint(0, 11)
-        open_tickets = np.random.randint(0, 15)
-        
-        score_engagement = max(100 - (last_login_days * 0.5), 0)
-        score_nps = nps_score * 10 
-        score_support = max(100 - (open_tickets * 5), 0)
-        health_score = int((score_engagement * 0.4) + (score_nps * 0.3) + (score_support * 0.3))
-        
-        days_to_renewal = np.random.randint(-15, 365)
-        renewal_date = current_date + timedelta(days=days_to_renewal)
+RISK_COLORS = {"Healthy": "#10B981", "At Risk": "#F59E0B", "Critical": "#EF4444"}
 
-        risk_status = "Healthy"
-        if days_to_renewal < 90 and health_score < 50:
-            risk_status = "Critical"
-        elif health_score < 70:
-            risk_status = "At Risk"
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def run_kpi_analysis(df):
+    arr = df['ARR'].to_numpy()
+    prev_arr = df['Previous_ARR'].to_numpy()
+    risk_code = df['Risk_Code'].to_numpy()
+    health_score = df['Health_Score'].to_numpy()
+    days_to_renewal = df['Days_To_Renewal'].to_numpy()
+    
+    # Single-row frame so callers can index KPIs exactly like a SQL result
+    return pd.DataFrame({
+        "Total_ARR": [arr.sum(dtype=np.float64)],
+        "Total_Prev_ARR": [prev_arr.sum(dtype=np.float64)],
+        "Critical_Risk_ARR": [arr[risk_code == CRITICAL].sum(dtype=np.float64)],
+        "Avg_Health": [health_score.mean()],
+        "Q1_Renewals": [((days_to_renewal > 0) & (days_to_renewal <= 90)).sum()]
+    })
 
-        data.append({
-            "Account_Name": fake.company(),
-            "Industry": np.random.choice(industries),
-            "ARR": round(arr, 2),
-            "Previous_ARR": round(previous_arr, 2),
-            "Tier": tier,
-            "Renewal_Date": renewal_date,
-            "Days_Since_Last_Touch": last_login_days,
-            "Health_Score": health_score,
-            "NPS": nps_score,
-            "Open_Tickets": open_tickets,
-            "Risk_Status": risk_status
-        })
-        
-    return pd.DataFrame(data)
+# --- 4. VIEW BUILDERS (cached on their inputs, so unrelated reruns skip them) ---
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def apply_filters(df, tiers, risks, search):
+    filtered_df = df.query("Tier_Code in @tiers and Risk_Code in @risks", engine="numexpr")
+    if search:
+        filtered_df = filtered_df[filtered_df['Account_Name_Lower'].str.contains(search.lower(), regex=False, na=False)]
+    return filtered_df
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def build_scatter(filtered_df):
+    fig = px.scatter(
+        with_labels(filtered_df), x="Health_Score", y="ARR", size="ARR", color="Risk_Status",
+        hover_name="Account_Name",
+        custom_data=["Tier", "NPS", "Risk_Status"], 
+        color_discrete_map=RISK_COLORS,
+        range_x=[0, 105], template="plotly_white", height=500
+    )
+    fig.update_traces(
+        marker=dict(line=dict(width=1, color='white')),
+        hovertemplate=(
+            "<b>%{hovertext}</b><br>" + 
+            "<span style='color:gray'>%{customdata[0]}</span><br><br>" + 
+            "<b>ARR:</b> %{y:$,.0f}<br>" +
+            "<b>Health:</b> %{x}%<br>" +
+            "<b>NPS:</b> %{customdata[1]}/10<br>" +
+            "<extra></extra>"
+        )
+    )
+    fig.update_layout(
+        hoverlabel=dict(bgcolor="white", font_size=14, font_family="Inter, sans-serif", bordercolor="#e2e8f0"),
+        xaxis_title="Health Score (Engagement + NPS)",
+        yaxis_title="Annual Recurring Revenue (ARR)",
+        legend_title_text=None
+    )
+    fig.add_vline(x=50, line_width=1, line_dash="dash", line_color="#EF4444", annotation_text="Critical Threshold")
+    return fig
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def build_risk_bar(filtered_df):
+    risk_chart = px.bar(
+        with_labels(filtered_df), x="Tier", y="ARR", color="Risk_Status", 
+        color_discrete_map=RISK_COLORS,
+    )
+    risk_chart.update_layout(showlegend=False, xaxis_title=None)
+    return risk_chart
 
-# --- 3. SQL ENGINE ---
-def run_sql_analysis(df):
-    conn = sqlite3.connect(':memory:')
-    df.to_sql('portfolio', conn, index=False, if_exists='replace')
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def build_industry_stats(filtered_df):
+    # Aggregate in Polars' lazy engine; hand pandas back to Plotly
+    return (
+        pl.from_pandas(filtered_df).lazy()
+        .group_by("Industry")
+        .agg([pl.col("ARR").cast(pl.Float64).sum(), pl.col("Account_Name").count(), pl.col("Health_Score").mean()])
+        # Cast so the order is alphabetical on every Polars version, not category order
+        .sort(pl.col("Industry").cast(pl.String))
+        .collect()
+        .to_pandas()
+    )
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def build_industry_bar(industry_stats):
+    fig_bar = px.bar(
+        industry_stats, x="Industry", y="ARR", text_auto='.2s',
+        color="ARR", color_continuous_scale="Tealgrn", 
+        custom_data=["Account_Name", "Health_Score"] 
+    )
+    fig_bar.update_traces(
+        marker_line_color='white', marker_line_width=1,
+        hovertemplate=(
+            "<b>%{x}</b><br>" +
+            "<span style='color:gray'>Market Segment</span><br><br>" +
+            "<b>Total ARR:</b> %{y:$,.0f}<br>" +
+            "<b>Accounts:</b> %{customdata[0]}<br>" +
+            "<b>Avg Health:</b> %{customdata[1]:.0f}/100<extra></extra>"
+        )
+    )
+    fig_bar.update_layout(
+        hoverlabel=dict(bgcolor="white", font_size=14, font_family="Inter", bordercolor="#e2e8f0"),
+        coloraxis_showscale=False, xaxis_title=None, yaxis_title=None, plot_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig_bar
+
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def build_risk_distribution(filtered_df):
+    # 1. Prepare Data: Count accounts per Industry & Risk Status
+    risk_distribution = (
+        pl.from_pandas(filtered_df).lazy()
+        .group_by(["Industry", "Risk_Code"])
+        .agg(pl.len().alias("Account_Count"))
+        .sort([pl.col("Industry").cast(pl.String), "Risk_Code"])
+        .collect()
+        .to_pandas()
+    )
+    risk_distribution['Risk_Status'] = np.take(RISK_LABELS, risk_distribution['Risk_Code'])
+    
+    # 2. Stacked Bar Chart
+    fig_risk = px.bar(
+        risk_distribution, 
+        x="Industry", 
+        y="Account_Count", 
+        color="Risk_Status",
+        # Stack them to show composition (100% view)
+        barmode="stack",
+        color_discrete_map=RISK_COLORS,
+    )
     
-    kpi_query = """
-    SELECT 
-        SUM(ARR) as Total_ARR,
-        SUM(Previous_ARR) as Total_Prev_ARR,
-        SUM(CASE WHEN Risk_Status = 'Critical' THEN ARR ELSE 0 END) as Critical_Risk_ARR,
-        AVG(Health_Score) as Avg_Health,
-        COUNT(CASE WHEN Renewal_Date BETWEEN datetime('now') AND datetime('now', '+90 days') THEN 1 END) as Q1_Renewals
-    FROM portfolio
-    """
-    kpis = pd.read_sql_query(kpi_query, conn)
-    conn.close()
-    return kpis
+    # 3. Clean UI & Tooltip
+    fig_risk.update_traces(
+        marker_line_color='white', 
+        marker_line_width=1,
+        hovertemplate=(
+            "<b>%{x}</b><br>" + # Industry
+            "Status: <b>%{fullData.name}</b><br>" + # The Color Group Name
+            "Count: <b>%{y} Accounts</b><extra></extra>"
+        )
+    )
+    
+    fig_risk.update_layout(
+        hoverlabel=dict(bgcolor="white", font_size=14, font_family="Inter", bordercolor="#e2e8f0"),
+        xaxis_title=None,
+        yaxis_title="Number of Accounts",
+        legend_title_text=None,
+        plot_bgcolor="rgba(0,0,0,0)",
+        # Move legend to the top for cleaner look
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig_risk
 
-# --- 4. MAIN APP ---
-def main():
-    # HEADER
-    c1, c2 = st.columns([3, 1])
-    with c1:
-        st.title("Enterprise Revenue Dashboard")
-        st.caption(f"Live SQL Analytics | Data Refreshed: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    with c2:
-        st.write("")
-        if st.button("Sync Warehouse", use_container_width=True):
-             st.cache_data.clear()
-             st.rerun()
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def build_action_plan(filtered_df):
+    # Logic: Critical/At Risk OR Healthy but Ignored (>90 Days)
+    mask = (filtered_df['Risk_Code'] != HEALTHY) | (filtered_df['Days_Since_Last_Touch'] > 90)
+    base = filtered_df.loc[mask]
+    
+    if base.empty:
+        return base
+    
+    # Vectorized rule evaluation: one boolean array per trigger
+    risk_code = base['Risk_Code'].to_numpy()
+    is_critical = risk_code == CRITICAL
+    is_at_risk = risk_code == AT_RISK
+    is_high_value = (base['ARR'] > 250000).to_numpy()
+    conditions = [is_critical & is_high_value, is_critical, is_at_risk]
 
-    # DATA
-    df = generate_enterprise_data(200)
-    kpi_data = run_sql_analysis(df)
+    # Definition 1: The Playbook
+    playbook = np.select(
+        conditions,
+        ["1. Executive Sponsor Call (CEO)", "2. Risk Mitigation Plan", "3. Strategy Session / QBR"],
+        default="4. Value Realization Report"
+    )
+
+    # Definition 2: The Rationale (THE WHY)
+    high_value_reason = ("High Value ($" + (base['ARR'] / 1000).round().astype(int).astype(str) + "k) + Critical Health").to_numpy()
+    drifting_reason = ("Drifting: No Contact for " + base['Days_Since_Last_Touch'].astype(str) + " Days").to_numpy()
+    rationale = np.select(
+        conditions,
+        [high_value_reason, "Health Score Critical (<50)", "Health Score Warning (<70)"],
+        default=drifting_reason
+    )
     
-    total_arr = kpi_data['Total_ARR'][0]
-    critical_risk = kpi_data['Critical_Risk_ARR'][0]
-    avg_health = kpi_data['Avg_Health'][0]
-    renewals_due = kpi_data['Q1_Renewals'][0]
+    # Single allocation for the derived frame instead of copy-then-add-columns
+    return base.assign(Recommended_Playbook=playbook, Rationale=rationale)
 
-    # KPIs
-    k1, k2, k3, k4 = st.columns(4)
-    with k1:
-        with st.container(border=True):
-            st.metric("Total ARR", f"${total_arr/1_000_000:.2f}M", "YoY +12%")
-    with k2:
-        with st.container(border=True):
-            st.metric("Critical Risk", f"${critical_risk/1_000_000:.2f}M", "Requires Action", delta_color="inverse")
-    with k3:
-        with st.container(border=True):
-            st.metric("Avg Health", f"{int(avg_health)}/100", "Weighted Score")
-    with k4:
-        with st.container(border=True):
-            st.metric("Q1 Renewals", int(renewals_due), "Urgent")
+@st.cache_data(hash_funcs=FRAME_HASH_FUNCS)
+def build_treemap(action_df):
+    fig_tree = px.treemap(
+        with_labels(action_df), 
+        path=['Recommended_Playbook', 'Risk_Status', 'Account_Name'], 
+        values='ARR',
+        color='Risk_Status',
+        color_discrete_map=RISK_COLORS,
+    )
+    fig_tree.update_traces(
+        root_color="#F1F5F9",
+        textinfo="label+value+percent parent",
+        hovertemplate="<b>%{label}</b><br>Value: %{value:$,.0f}<extra></extra>"
+    )
+    fig_tree.update_layout(
+        margin=dict(t=0, l=0, r=0, b=0), 
+        hoverlabel=dict(bgcolor="white", font_size=14, font_family="Inter")
+    )
+    return fig_tree
 
+# --- 5. MAIN APP ---
+# Widget changes in here rerun only this fragment, not the header, KPIs or data load
+@st.fragment
+def portfolio_section(df):
     # FILTERS
     st.markdown("<div style='margin-top: 20px;'></div>", unsafe_allow_html=True)
     with st.container(border=True):
         st.subheader("Portfolio Controls")
         f1, f2, f3 = st.columns(3)
         with f1:
-            tier_filter = st.multiselect("Filter by Tier", options=df['Tier'].unique(), default=df['Tier'].unique())
+            tier_filter = st.multiselect("Filter by Tier", options=TIER_LABELS, default=TIER_LABELS)
         with f2:
-            risk_filter = st.multiselect("Filter by Risk Status", options=df['Risk_Status'].unique(), default=["Critical", "At Risk"])
+            risk_filter = st.multiselect("Filter by Risk Status", options=RISK_LABELS, default=["Critical", "At Risk"])
         with f3:
             search = st.text_input("Find Specific Account", placeholder="e.g. Acme Corp...")
 
-    mask = (df['Tier'].isin(tier_filter)) & (df['Risk_Status'].isin(risk_filter))
-    if search:
-        mask = mask & (df['Account_Name'].str.contains(search, case=False))
-    filtered_df = df[mask]
+    # Translate the selected labels back to codes before filtering
+    tier_codes = np.flatnonzero(np.isin(TIER_LABELS, tier_filter)).tolist()
+    risk_codes = np.flatnonzero(np.isin(RISK_LABELS, risk_filter)).tolist()
+    filtered_df = apply_filters(df, tier_codes, risk_codes, search)
 
     # VISUALS
     tab1, tab2 = st.tabs(["Retention Analysis", "Territory Overview"])
@@ -176,40 +364,10 @@ def main():
             st.markdown("#### Risk Detection Engine")
             c_left, c_right = st.columns([2, 1])
             with c_left:
-                fig = px.scatter(
-                    filtered_df, x="Health_Score", y="ARR", size="ARR", color="Risk_Status",
-                    hover_name="Account_Name",
-                    custom_data=["Tier", "NPS", "Risk_Status"], 
-                    color_discrete_map={"Healthy": "#10B981", "At Risk": "#F59E0B", "Critical": "#EF4444"},
-                    range_x=[0, 105], template="plotly_white", height=500
-                )
-                fig.update_traces(
-                    marker=dict(line=dict(width=1, color='white')),
-                    hovertemplate=(
-                        "<b>%{hovertext}</b><br>" + 
-                        "<span style='color:gray'>%{customdata[0]}</span><br><br>" + 
-                        "<b>ARR:</b> %{y:$,.0f}<br>" +
-                        "<b>Health:</b> %{x}%<br>" +
-                        "<b>NPS:</b> %{customdata[1]}/10<br>" +
-                        "<extra></extra>"
-                    )
-                )
-                fig.update_layout(
-                    hoverlabel=dict(bgcolor="white", font_size=14, font_family="Inter, sans-serif", bordercolor="#e2e8f0"),
-                    xaxis_title="Health Score (Engagement + NPS)",
-                    yaxis_title="Annual Recurring Revenue (ARR)",
-                    legend_title_text=None
-                )
-                fig.add_vline(x=50, line_width=1, line_dash="dash", line_color="#EF4444", annotation_text="Critical Threshold")
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(build_scatter(filtered_df), use_container_width=True)
                 
             with c_right:
-                risk_chart = px.bar(
-                    filtered_df, x="Tier", y="ARR", color="Risk_Status", 
-                    color_discrete_map={"Healthy": "#10B981", "At Risk": "#F59E0B", "Critical": "#EF4444"},
-                )
-                risk_chart.update_layout(showlegend=False, xaxis_title=None)
-                st.plotly_chart(risk_chart, use_container_width=True)
+                st.plotly_chart(build_risk_bar(filtered_df), use_container_width=True)
 
     with tab2:
         with st.container(border=True):
@@ -217,130 +375,27 @@ def main():
             t_left, t_right = st.columns([1, 1])
             with t_left:
                 st.caption("Revenue Concentration by Industry")
-                industry_stats = filtered_df.groupby("Industry").agg({
-                    "ARR": "sum", "Account_Name": "count", "Health_Score": "mean"
-                }).reset_index()
-                
-                fig_bar = px.bar(
-                    industry_stats, x="Industry", y="ARR", text_auto='.2s',
-                    color="ARR", color_continuous_scale="Tealgrn", 
-                    custom_data=["Account_Name", "Health_Score"] 
-                )
-                fig_bar.update_traces(
-                    marker_line_color='white', marker_line_width=1,
-                    hovertemplate=(
-                        "<b>%{x}</b><br>" +
-                        "<span style='color:gray'>Market Segment</span><br><br>" +
-                        "<b>Total ARR:</b> %{y:$,.0f}<br>" +
-                        "<b>Accounts:</b> %{customdata[0]}<br>" +
-                        "<b>Avg Health:</b> %{customdata[1]:.0f}/100<extra></extra>"
-                    )
-                )
-                fig_bar.update_layout(
-                    hoverlabel=dict(bgcolor="white", font_size=14, font_family="Inter", bordercolor="#e2e8f0"),
-                    coloraxis_showscale=False, xaxis_title=None, yaxis_title=None, plot_bgcolor="rgba(0,0,0,0)"
-                )
-                st.plotly_chart(fig_bar, use_container_width=True)
+                industry_stats = build_industry_stats(filtered_df)
+                st.plotly_chart(build_industry_bar(industry_stats), use_container_width=True)
                 
             with t_right:
                 st.caption("Risk Distribution by Industry")
-                
-                # 1. Prepare Data: Count accounts per Industry & Risk Status
-                risk_distribution = filtered_df.groupby(["Industry", "Risk_Status"]).size().reset_index(name='Account_Count')
-                
-                # 2. Stacked Bar Chart
-                fig_risk = px.bar(
-                    risk_distribution, 
-                    x="Industry", 
-                    y="Account_Count", 
-                    color="Risk_Status",
-                    # Stack them to show composition (100% view)
-                    barmode="stack",
-                    color_discrete_map={"Healthy": "#10B981", "At Risk": "#F59E0B", "Critical": "#EF4444"},
-                )
-                
-                # 3. Clean UI & Tooltip
-                fig_risk.update_traces(
-                    marker_line_color='white', 
-                    marker_line_width=1,
-                    hovertemplate=(
-                        "<b>%{x}</b><br>" + # Industry
-                        "Status: <b>%{fullData.name}</b><br>" + # The Color Group Name
-                        "Count: <b>%{y} Accounts</b><extra></extra>"
-                    )
-                )
-                
-                fig_risk.update_layout(
-                    hoverlabel=dict(bgcolor="white", font_size=14, font_family="Inter", bordercolor="#e2e8f0"),
-                    xaxis_title=None,
-                    yaxis_title="Number of Accounts",
-                    legend_title_text=None,
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    # Move legend to the top for cleaner look
-                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                )
-                
-                st.plotly_chart(fig_risk, use_container_width=True)
+                st.plotly_chart(build_risk_distribution(filtered_df), use_container_width=True)
 
     # --- STRATEGIC INTERVENTION PLAN (HORIZONTAL TREEMAP + RATIONALE) ---
     st.markdown("### Strategic Intervention Plan")
     st.info("Prioritized list of accounts requiring immediate executive or strategic action.")
     
-    # Logic: Critical/At Risk OR Healthy but Ignored (>90 Days)
-    action_df = filtered_df[
-        (filtered_df['Risk_Status'] != "Healthy") | 
-        (filtered_df['Days_Since_Last_Touch'] > 90)
-    ].copy()
+    action_df = build_action_plan(filtered_df)
     
-    # Definition 1: The Playbook
-    def get_strategic_playbook(row):
-        if row['Risk_Status'] == 'Critical' and row['ARR'] > 250000:
-            return "1. Executive Sponsor Call (CEO)"
-        elif row['Risk_Status'] == 'Critical':
-            return "2. Risk Mitigation Plan"
-        elif row['Risk_Status'] == 'At Risk':
-             return "3. Strategy Session / QBR"
-        else:
-            return "4. Value Realization Report"
-
-    # Definition 2: The Rationale (THE WHY)
-    def get_rationale(row):
-        if row['Risk_Status'] == 'Critical' and row['ARR'] > 250000:
-            return f"High Value (${row['ARR']/1000:.0f}k) + Critical Health"
-        elif row['Risk_Status'] == 'Critical':
-            return "Health Score Critical (<50)"
-        elif row['Risk_Status'] == 'At Risk':
-             return "Health Score Warning (<70)"
-        else:
-            return f"Drifting: No Contact for {row['Days_Since_Last_Touch']} Days"
-
     if not action_df.empty:
-        action_df['Recommended_Playbook'] = action_df.apply(get_strategic_playbook, axis=1)
-        action_df['Rationale'] = action_df.apply(get_rationale, axis=1) # Apply the Rationale
-        
         # 1. Full Width Treemap
         st.markdown("#### Capital at Risk Map (Click to Zoom)")
-        fig_tree = px.treemap(
-            action_df, 
-            path=['Recommended_Playbook', 'Risk_Status', 'Account_Name'], 
-            values='ARR',
-            color='Risk_Status',
-            color_discrete_map={"Healthy": "#10B981", "At Risk": "#F59E0B", "Critical": "#EF4444"},
-        )
-        fig_tree.update_traces(
-            root_color="#F1F5F9",
-            textinfo="label+value+percent parent",
-            hovertemplate="<b>%{label}</b><br>Value: %{value:$,.0f}<extra></extra>"
-        )
-        fig_tree.update_layout(
-            margin=dict(t=0, l=0, r=0, b=0), 
-            hoverlabel=dict(bgcolor="white", font_size=14, font_family="Inter")
-        )
-        st.plotly_chart(fig_tree, use_container_width=True)
+        st.plotly_chart(build_treemap(action_df), use_container_width=True)
 
         # 2. Action Queue Below
         st.markdown("#### Action Queue")
-        display_df = action_df.sort_values(by=['Recommended_Playbook', 'ARR'], ascending=[True, False])
+        display_df = with_labels(action_df.sort_values(by=['Recommended_Playbook', 'ARR'], ascending=[True, False]))
         
         st.dataframe(
             display_df[['Account_Name', 'ARR', 'Risk_Status', 'Recommended_Playbook', 'Rationale']], 
@@ -357,5 +412,44 @@ def main():
     else:
         st.success("Great job! No accounts currently require intervention.")
 
+def main():
+    # HEADER
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        st.title("Enterprise Revenue Dashboard")
+        st.caption(f"Live Portfolio Analytics | Data Refreshed: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    with c2:
+        st.write("")
+        if st.button("Sync Warehouse", use_container_width=True):
+             st.cache_data.clear()
+             st.rerun()
+
+    # DATA
+    df = generate_enterprise_data(200)
+    kpi_data = run_kpi_analysis(df)
+    
+    total_arr = kpi_data['Total_ARR'][0]
+    critical_risk = kpi_data['Critical_Risk_ARR'][0]
+    avg_health = kpi_data['Avg_Health'][0]
+    renewals_due = kpi_data['Q1_Renewals'][0]
+
+    # KPIs
+    k1, k2, k3, k4 = st.columns(4)
+    with k1:
+        with st.container(border=True):
+            st.metric("Total ARR", f"${total_arr/1_000_000:.2f}M", "YoY +12%")
+    with k2:
+        with st.container(border=True):
+            st.metric("Critical Risk", f"${critical_risk/1_000_000:.2f}M", "Requires Action", delta_color="inverse")
+    with k3:
+        with st.container(border=True):
+            st.metric("Avg Health", f"{int(avg_health)}/100", "Weighted Score")
+    with k4:
+        with st.container(border=True):
+            st.metric("Q1 Renewals", int(renewals_due), "Urgent")
+
+    # PORTFOLIO (filters, visuals, intervention plan)
+    portfolio_section(df)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -22,15 +22,24 @@ def init_database():
         # 2. Connect to SQLite
         conn = sqlite3.connect(db_file)
 
-        # 3. Load CSV into a Pandas Dataframe
-        df = pd.read_csv(csv_file, encoding='latin1')
+        # 3. Load CSV into a Pandas Dataframe (multi-threaded Arrow reader)
+        df = pd.read_csv(csv_file, encoding='latin1', engine='pyarrow', dtype_backend='pyarrow')
 
         # 4. Clean column names
         df.columns = [c.replace(' ', '_').replace('/', '_').upper() for c in df.columns]
 
         # 5. Push Dataframe to SQL
+        # to_sql already batches rows via executemany in one transaction;
+        # relaxing fsync on commit is what speeds up the on-disk load
+        conn.execute("PRAGMA synchronous=NORMAL")
         df.to_sql('SALES_RECORDS', conn, if_exists='replace', index=False)
 
+        # 6. Index the analysis keys and refresh planner statistics
+        with conn:
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_customer ON SALES_RECORDS(CUSTOMERNAME)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_orderdate ON SALES_RECORDS(ORDERDATE)")
+        conn.execute("ANALYZE")
+
         print(f"✅ Success! Database created with {len(df)} rows.")
         
         conn.close()